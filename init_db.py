@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine
 import os
 
 # Connect to Server (no DB)
@@ -12,22 +12,40 @@ encoded_password = quote_plus(password)
 conn_str = f"mysql+mysqlconnector://{user}:{encoded_password}@{host}:{port}"
 engine = create_engine(conn_str, isolation_level="AUTOCOMMIT")
 
+def split_statements(sql_script):
+    """Split DDL into statements. sqlparse is semicolon-in-string safe;
+    plain split(';') remains as the fallback."""
+    try:
+        import sqlparse
+        return [s for s in sqlparse.split(sql_script) if s.strip()]
+    except ImportError:
+        return [s for s in sql_script.split(';') if s.strip()]
+
 print("Initializing Database...")
 try:
-    with engine.connect() as conn:
-        with open('sql/ddl/staging_and_dwh.sql', 'r') as f:
-            sql_script = f.read()
-        
-        # Split by ; to run statements
-        statements = sql_script.split(';')
-        for stmt in statements:
-            if stmt.strip():
+    with open('sql/ddl/staging_and_dwh.sql', 'r') as f:
+        sql_script = f.read()
+
+    # Prefer one multi-statement round trip on the raw mysql-connector
+    # cursor; fall back to per-statement execution on other drivers.
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        try:
+            for result in cursor.execute(sql_script, multi=True):
+                print(f"Executed: {result.statement[:50]}...")
+        except TypeError:
+            # Driver without multi=True support
+            for stmt in split_statements(sql_script):
                 try:
-                    conn.execute(text(stmt))
+                    cursor.execute(stmt)
                     print(f"Executed: {stmt[:50]}...")
                 except Exception as e:
                     print(f"Error executing statement: {e}")
-                    
+        raw.commit()
+    finally:
+        raw.close()
+
     print("Database Initialized Successfully.")
 except Exception as e:
     print(f"Failed to initialize: {e}")
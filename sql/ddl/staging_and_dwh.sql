@@ -115,7 +115,8 @@ CREATE TABLE IF NOT EXISTS dim_address (
   state_province VARCHAR(100),
   city VARCHAR(100),
   postal_code VARCHAR(50),
-  created_at DATETIME
+  created_at DATETIME,
+  UNIQUE KEY (customer_id, postal_code)
 );
 
 CREATE TABLE IF NOT EXISTS dim_date (
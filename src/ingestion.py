@@ -1,33 +1,99 @@
 import zipfile
 import pandas as pd
+import fnmatch
 import glob
 import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from src.utils import setup_logger, get_db_connection
 
 logger = setup_logger('ingestion')
 
+# Columns the pipeline actually consumes (snake_case-normalized header
+# names). Everything is declared as string: IDs/postal codes must not be
+# inferred as numeric, and currency/date columns are coerced downstream
+# by Standardizer. Declaring dtypes up front skips the inference pass.
+PIPELINE_COLUMNS = {
+    'customer_id', 'customer_name', 'customer_title', 'customer_first_name',
+    'customer_middle_name', 'customer_last_name', 'customer_segment',
+    'maritial_status', 'marital_status', 'gender', 'dob',
+    'effective_start_dt', 'effective_end_dt', 'policy_type_id',
+    'policy_type', 'policy_type_desc', 'policy_id', 'policy_name',
+    'premium_amt', 'policy_term', 'policy_start_dt', 'policy_end_dt',
+    'next_premium_dt', 'actual_premium_paid_dt', 'country', 'region',
+    'state_or_province', 'city', 'postal_code', 'total_policy_amt',
+    'premium_amt_paid_tilldate',
+}
+
+def _normalize_header(name: str) -> str:
+    return name.strip().lower().replace(' ', '_')
+
 class Ingestor:
     """Base Ingestion Class"""
     def __init__(self):
         pass
 
+# Below this size, streaming is cheaper than setting up a memory map.
+_MMAP_MIN_BYTES = 10 << 20
+
 class FileIngestor(Ingestor):
+    @staticmethod
+    def _read_csv_fast(file_path: str, **kwargs) -> pd.DataFrame:
+        """
+        pd.read_csv with the multi-threaded pyarrow engine when available.
+        Large local files with no pandas-level options are read through an
+        OS memory map so the page cache feeds Arrow's tokenizer without a
+        userspace copy. Falls back to the default C engine if pyarrow is
+        not installed or the caller passes unsupported options.
+        """
+        engine = kwargs.pop('engine', 'pyarrow')
+        if engine == 'pyarrow':
+            if (not kwargs and isinstance(file_path, str)
+                    and os.path.isfile(file_path)
+                    and os.path.getsize(file_path) >= _MMAP_MIN_BYTES):
+                try:
+                    import pyarrow as pa
+                    from pyarrow import csv as pa_csv
+                    with pa.memory_map(file_path, 'r') as mm:
+                        table = pa_csv.read_csv(
+                            mm, read_options=pa_csv.ReadOptions(use_threads=True))
+                    return table.to_pandas(split_blocks=True)
+                except Exception as e:
+                    logger.warning(f"Memory-mapped read failed for {file_path} ({e}).")
+            try:
+                return pd.read_csv(file_path, engine='pyarrow', **kwargs)
+            except (ImportError, ValueError) as e:
+                logger.warning(f"pyarrow engine unavailable ({e}). Falling back to C engine.")
+        return pd.read_csv(file_path, **kwargs)
+
     @staticmethod
     def read_csv(file_path: str, **kwargs) -> pd.DataFrame:
-        """Reads a single CSV file."""
+        """Reads a single CSV file (pyarrow engine by default)."""
         try:
-            df = pd.read_csv(file_path, **kwargs)
+            df = FileIngestor._read_csv_fast(file_path, **kwargs)
             logger.info(f"Successfully read CSV: {file_path}. Shape: {df.shape}")
             return df
         except Exception as e:
             logger.error(f"Error reading CSV {file_path}: {e}")
             raise e
 
+    @staticmethod
+    def _read_excel_fast(file_path: str, **kwargs) -> pd.DataFrame:
+        """
+        pd.read_excel with the calamine engine (Rust xlsx reader, single
+        pass) when installed; openpyxl otherwise.
+        """
+        if 'engine' not in kwargs:
+            try:
+                return pd.read_excel(file_path, engine='calamine', **kwargs)
+            except (ImportError, ValueError) as e:
+                logger.warning(f"calamine engine unavailable ({e}). Using default engine.")
+        return pd.read_excel(file_path, **kwargs)
+
     @staticmethod
     def read_excel(file_path: str, sheet_name=0, **kwargs) -> pd.DataFrame:
-        """Reads an Excel file."""
+        """Reads an Excel file (calamine engine by default)."""
         try:
-            df = pd.read_excel(file_path, sheet_name=sheet_name, **kwargs)
+            df = FileIngestor._read_excel_fast(file_path, sheet_name=sheet_name, **kwargs)
             logger.info(f"Successfully read Excel: {file_path}. Shape: {df.shape}")
             return df
         except Exception as e:
@@ -47,58 +113,144 @@ class FileIngestor(Ingestor):
             logger.error(f"Failed to unzip {zip_path}: {e}")
         return extracted_files
 
+    @staticmethod
+    def _read_one(file: str, **kwargs) -> pd.DataFrame:
+        """Reads a single CSV/Excel file and tags it with its source filename."""
+        if file.endswith('.csv'):
+            kwargs.setdefault('dtype', str)
+            df = FileIngestor._read_csv_fast(file, **kwargs)
+            df = df[[c for c in df.columns if _normalize_header(c) in PIPELINE_COLUMNS]]
+        elif file.endswith('.xlsx') or file.endswith('.xls'):
+            df = FileIngestor._read_excel_fast(file, **kwargs)
+        else:
+            return None
+
+        df['source_file'] = os.path.basename(file)
+        return df
+
+    @staticmethod
+    def read_zip_members(zip_path: str, file_pattern: str = "*", exclude_names=(), **kwargs) -> list:
+        """
+        Streams CSV members of a zip straight into DataFrames, skipping the
+        extract-to-disk + re-read round trip. Members whose basenames are in
+        exclude_names (e.g. already present on disk) are skipped.
+        """
+        df_list = []
+        try:
+            with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+                for name in zip_ref.namelist():
+                    base = os.path.basename(name)
+                    if not base.endswith('.csv') or base in exclude_names:
+                        continue
+                    if not fnmatch.fnmatch(base, file_pattern):
+                        continue
+                    try:
+                        kwargs.setdefault('dtype', str)
+                        with zip_ref.open(name) as fh:
+                            df = pd.read_csv(fh, **kwargs)
+                        df = df[[c for c in df.columns if _normalize_header(c) in PIPELINE_COLUMNS]]
+                        df['source_file'] = base
+                        df_list.append(df)
+                    except Exception as e:
+                        logger.error(f"Failed to read {name} from {zip_path}: {e}")
+        except Exception as e:
+            logger.error(f"Failed to open zip {zip_path}: {e}")
+        return df_list
+
     @staticmethod
     def read_folder(folder_path: str, file_pattern: str = "*", recursive: bool = False, **kwargs) -> pd.DataFrame:
         """
-        Reads files from a folder. 
-        Auto-handles ZIP extraction if zip files are found.
+        Reads files from a folder.
+        CSV members of zip archives are streamed in-memory (no extraction
+        to disk). Per-file reads run on a thread pool (pandas releases the
+        GIL while parsing in C), then a single concat at the end.
         """
-        # 1. Handle ZIPs first
-        zip_files = glob.glob(os.path.join(folder_path, "*.zip"))
-        if zip_files:
-            logger.info(f"Found {len(zip_files)} zip files. Extracting...")
-            for zf in zip_files:
-                FileIngestor.extract_zip(zf, folder_path)
-        
-        # 2. Read contents (CSV/Excel)
-        # Supports CSV and XLSX
-        search_path = os.path.join(folder_path, file_pattern)
-        all_files = glob.glob(search_path, recursive=recursive)
-        
+        # 1. Scan the folder once with os.scandir and classify entries —
+        # avoids the duplicate directory walk (+ per-entry stat) of
+        # separate globs for data files and zips. Recursive reads keep
+        # the glob path since scandir is single-level.
+        if recursive:
+            search_path = os.path.join(folder_path, file_pattern)
+            all_files = glob.glob(search_path, recursive=True)
+            zip_files = glob.glob(os.path.join(folder_path, "*.zip"))
+        else:
+            all_files, zip_files = [], []
+            with os.scandir(folder_path) as it:
+                for entry in it:
+                    if not entry.is_file():
+                        continue
+                    if entry.name.endswith('.zip'):
+                        zip_files.append(entry.path)
+                    elif fnmatch.fnmatch(entry.name, file_pattern):
+                        all_files.append(entry.path)
+
+        # Skip the zip files themselves and temp files
+        all_files = [f for f in all_files
+                     if not f.endswith('.zip') and not os.path.basename(f).startswith('~$')]
+
         df_list = []
-        for file in all_files:
-            # Skip the zip files themselves and temp files
-            if file.endswith('.zip') or file.startswith('~$'):
-                continue
-                
-            try:
-                if file.endswith('.csv'):
-                    df = pd.read_csv(file, **kwargs)
-                elif file.endswith('.xlsx') or file.endswith('.xls'):
-                    df = pd.read_excel(file, **kwargs)
-                else:
-                    continue
-                
-                df['source_file'] = os.path.basename(file)
-                df_list.append(df)
-            except Exception as e:
-                logger.error(f"Failed to read {file}: {e}")
-        
+        if all_files:
+            with ThreadPoolExecutor(max_workers=min(len(all_files), os.cpu_count() or 4)) as executor:
+                futures = {executor.submit(FileIngestor._read_one, f, **kwargs): f for f in all_files}
+                for fut in as_completed(futures):
+                    file = futures[fut]
+                    try:
+                        df = fut.result()
+                        if df is not None:
+                            df_list.append(df)
+                    except Exception as e:
+                        logger.error(f"Failed to read {file}: {e}")
+
+        # 2. Stream zipped CSVs directly; files already on disk take
+        # precedence so extracted copies are not ingested twice.
+        on_disk = {os.path.basename(f) for f in all_files}
+        for zf in zip_files:
+            df_list.extend(FileIngestor.read_zip_members(zf, file_pattern, exclude_names=on_disk, **kwargs))
+
         if df_list:
-            final_df = pd.concat(df_list, ignore_index=True)
+            final_df = FileIngestor._concat_frames(df_list)
             logger.info(f"Ingested {len(df_list)} files from {folder_path}. Total Shape: {final_df.shape}")
             return final_df
         else:
             return pd.DataFrame()
 
+    @staticmethod
+    def _concat_frames(df_list: list) -> pd.DataFrame:
+        """
+        Concatenates per-file DataFrames via pyarrow.concat_tables
+        (zero-copy chunked concat, single pandas materialization at the
+        end) instead of pd.concat's row-copy pass. Falls back to
+        pd.concat if pyarrow is unavailable.
+        """
+        try:
+            import pyarrow as pa
+            tables = [pa.Table.from_pandas(df, preserve_index=False) for df in df_list]
+            combined = pa.concat_tables(tables, promote_options='default')
+            return combined.to_pandas(self_destruct=True, split_blocks=True)
+        except Exception as e:
+            logger.warning(f"Arrow concat unavailable ({e}). Using pd.concat.")
+            return pd.concat(df_list, ignore_index=True)
+
 class SQLIngestor(Ingestor):
     def __init__(self, db_config=None, db_type='mysql'):
         self.engine = get_db_connection(db_type, db_config)
 
-    def read_query(self, query: str) -> pd.DataFrame:
-        """Executes a SQL query and returns a DataFrame."""
+    def read_query(self, query, params=None, stream_results: bool = False, chunksize: int = 50000) -> pd.DataFrame:
+        """
+        Executes a SQL query and returns a DataFrame.
+        params are passed through to pd.read_sql for bound statements.
+        With stream_results=True a server-side cursor feeds rows in
+        chunks instead of buffering the whole result set on the client —
+        use it for large dimension scans.
+        """
         try:
-            df = pd.read_sql(query, self.engine)
+            if stream_results:
+                with self.engine.connect().execution_options(
+                        stream_results=True, yield_per=chunksize) as conn:
+                    chunks = list(pd.read_sql(query, conn, chunksize=chunksize, params=params))
+                df = pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame()
+            else:
+                df = pd.read_sql(query, self.engine, params=params)
             logger.info(f"Executed query. Returned {len(df)} rows.")
             return df
         except Exception as e:
@@ -1,4 +1,7 @@
+import os
+import tempfile
 import pandas as pd
+from sqlalchemy import text
 from src.utils import setup_logger, get_db_connection
 
 logger = setup_logger('loader')
@@ -7,28 +10,118 @@ class Loader:
     def __init__(self, db_type='mysql', config=None):
         """Initializes the Loader with a database connection."""
         self.engine = get_db_connection(db_type, config)
+        self.db_type = db_type
 
-    def load_to_db(self, df: pd.DataFrame, table_name: str, if_exists='append', chunksize=1000):
+    def _load_infile(self, df: pd.DataFrame, table_name: str):
+        """
+        Bulk loads via MySQL LOAD DATA LOCAL INFILE from a temporary CSV
+        on disk — the client driver reads the file named in the statement
+        and streams it to the server in one round trip instead of one
+        parameterized INSERT per chunk. Requires local_infile enabled on
+        both client and server.
+        """
+        tmp = tempfile.NamedTemporaryFile(
+            mode='w', suffix='.csv', newline='', encoding='utf-8', delete=False)
+        try:
+            df.to_csv(tmp, index=False, header=False, na_rep='\\N')
+            tmp.close()
+            # Escape for the SQL string literal (Windows paths contain
+            # backslashes).
+            path = tmp.name.replace('\\', '\\\\').replace("'", "\\'")
+            raw = self.engine.raw_connection()
+            try:
+                cursor = raw.cursor()
+                cols = ", ".join(f"`{c}`" for c in df.columns)
+                cursor.execute(
+                    f"LOAD DATA LOCAL INFILE '{path}' INTO TABLE {table_name} "
+                    f"FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '\"' "
+                    f"LINES TERMINATED BY '\\n' ({cols})"
+                )
+                raw.commit()
+            finally:
+                raw.close()
+        finally:
+            tmp.close()
+            os.unlink(tmp.name)
+
+    def has_rows(self, table_name: str) -> bool:
+        """True if the table already contains at least one row."""
+        with self.engine.connect() as conn:
+            result = conn.execute(text(f"SELECT EXISTS(SELECT 1 FROM {table_name} LIMIT 1)"))
+            return bool(result.scalar())
+
+    def upsert(self, df: pd.DataFrame, table_name: str, update_cols: list = None, chunksize=10000):
+        """
+        Idempotent dim load: INSERT ... ON DUPLICATE KEY UPDATE for the
+        given update_cols, or INSERT IGNORE when none. Re-runs then skip
+        or refresh existing keys in the database instead of re-sending
+        every row and swallowing PK errors client-side.
+        """
+        if df.empty:
+            logger.warning(f"Dataframe for {table_name} is empty. Skipping upsert.")
+            return
+
+        cols = list(df.columns)
+        col_sql = ", ".join(f"`{c}`" for c in cols)
+        placeholders = ", ".join(["%s"] * len(cols))
+        if update_cols:
+            updates = ", ".join(f"`{c}`=VALUES(`{c}`)" for c in update_cols)
+            sql = f"INSERT INTO {table_name} ({col_sql}) VALUES ({placeholders}) ON DUPLICATE KEY UPDATE {updates}"
+        else:
+            sql = f"INSERT IGNORE INTO {table_name} ({col_sql}) VALUES ({placeholders})"
+
+        rows = [tuple(None if pd.isna(v) else v for v in row)
+                for row in df.itertuples(index=False, name=None)]
+
+        raw = self.engine.raw_connection()
+        try:
+            cursor = raw.cursor()
+            for i in range(0, len(rows), chunksize):
+                cursor.executemany(sql, rows[i:i + chunksize])
+            raw.commit()
+            logger.info(f"✅ Upserted {len(rows)} rows into '{table_name}'.")
+        finally:
+            raw.close()
+
+    def load_to_db(self, df: pd.DataFrame, table_name: str, if_exists='append', chunksize=10000, con=None, method='multi'):
         """
         Loads a pandas DataFrame into a database table.
-        
+
+        Tries MySQL LOAD DATA LOCAL INFILE first (bulk path), falling back
+        to to_sql with multi-row INSERTs.
+
         Args:
             df (pd.DataFrame): Data to load.
             table_name (str): Target table name in MySQL.
             if_exists (str): 'fail', 'replace', or 'append'. Default 'append'.
             chunksize (int): Rows to load per batch.
+            con: Optional open connection/transaction. When given, the
+                load joins the caller's transaction (one commit for
+                several loads) instead of opening its own.
+            method: to_sql insert method. Defaults to 'multi' (many rows
+                per INSERT); callers can pass a callable, e.g. a
+                COPY-based loader on Postgres.
         """
         if df.empty:
             logger.warning(f"Dataframe for {table_name} is empty. Skipping load.")
             return
 
+        if con is None and self.db_type == 'mysql' and if_exists == 'append':
+            try:
+                self._load_infile(df, table_name)
+                logger.info(f"✅ Bulk loaded {len(df)} rows into table '{table_name}' via LOAD DATA.")
+                return
+            except Exception as e:
+                logger.warning(f"LOAD DATA unavailable for {table_name} ({e}). Falling back to to_sql.")
+
         try:
             df.to_sql(
-                name=table_name, 
-                con=self.engine, 
-                if_exists=if_exists, 
-                index=False, 
-                chunksize=chunksize
+                name=table_name,
+                con=con if con is not None else self.engine,
+                if_exists=if_exists,
+                index=False,
+                chunksize=chunksize,
+                method=method
             )
             logger.info(f"✅ Successfully loaded {len(df)} rows into table '{table_name}' (Mode: {if_exists}).")
         except Exception as e:
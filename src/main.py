@@ -1,13 +1,18 @@
 import sys
 import os
+import gc
 import traceback
-import glob
 import re
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import lru_cache
+import numpy as np
 import pandas as pd
+from sqlalchemy import bindparam, text
 
-# Add project root to path
-sys.path.append(os.getcwd())
+# Add project root to path (derived from this file, not the invocation
+# directory, so `python src/main.py` works from anywhere)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from src.utils import setup_logger
 from src.ingestion import FileIngestor, SQLIngestor
@@ -18,13 +23,118 @@ from src.loader import Loader
 
 logger = setup_logger('main_pipeline')
 
-def process_batch(df: pd.DataFrame, batch_name: str = "Unknown"):
+# Day-batch source file pattern: ..._dayX.csv
+_DAY_RE = re.compile(r'day(\d+)\.csv$', re.IGNORECASE)
+
+# Keep string columns created during merges/splits on Arrow storage so
+# .str ops stay in Arrow compute kernels instead of object-dtype loops.
+try:
+    import pyarrow  # noqa: F401
+    pd.options.mode.string_storage = 'pyarrow'
+except ImportError:
+    pass
+
+# String columns the staging/DWH splits actually consume. The 4.3 trim
+# pass only walks these — IDs and customer_name are cleaned upstream,
+# and columns outside this list never reach a load, so scanning them
+# would be wasted work.
+TRIM_COLS = [
+    'customer_segment', 'marital_status', 'gender', 'region', 'country',
+    'state_province', 'city', 'postal_code', 'policy_name',
+    'policy_type_name', 'policy_type_desc', 'policy_term',
+]
+
+# Shared Loader/SQLIngestor, built lazily once per process — both wrap
+# the cached SQLAlchemy engine, so per-batch construction only burned
+# cycles re-wrapping the same pool.
+_LOADER = None
+_SQL_READER = None
+
+
+def _get_loader():
+    global _LOADER
+    if _LOADER is None:
+        _LOADER = Loader(db_type='mysql')
+    return _LOADER
+
+
+def _get_sql_reader():
+    global _SQL_READER
+    if _SQL_READER is None:
+        _SQL_READER = SQLIngestor(db_type='mysql')
+    return _SQL_READER
+
+
+# Dimension lookup maps for fact linking, cached across day batches —
+# the dims only grow, so re-reading them in full every day multiplies
+# the map I/O by the number of days.
+_dim_cache = {'cust': None, 'pol': None, 'addr': None, 'fee': None}
+
+
+def _get_dim_maps(sql_reader):
     """
-    Processing logic for a single dataframe/batch.
-    Contains Steps 2 (Standardization) through 7 (Loading).
+    Returns (map_cust, map_pol, map_addr, map_fee), refreshed
+    incrementally: after the first full load, later batches fetch only
+    rows above each cached max surrogate key (AUTO_INCREMENT, so new
+    rows always sort after cached ones). SCD2 expiry rewrites
+    eff_end_dt on old rows, but the merge_asof linkage picks versions
+    by eff_start_dt, so the stale end date in cache is harmless.
+    dim_late_fee is static and fetched exactly once.
     """
-    logger.info(f"--- Processing Batch: {batch_name} (Rows: {len(df)}) ---")
+    specs = [
+        ('cust', 'customer_sk',
+         "SELECT customer_sk, customer_id, eff_start_dt, eff_end_dt FROM dim_customer"),
+        ('pol', 'policy_sk', "SELECT policy_sk, policy_id FROM dim_policy"),
+        ('addr', 'address_sk', "SELECT address_sk, customer_id, postal_code FROM dim_address"),
+    ]
+    for key, sk_col, query in specs:
+        cached = _dim_cache[key]
+        if cached is None or cached.empty:
+            _dim_cache[key] = sql_reader.read_query(query, stream_results=True)
+        else:
+            delta = sql_reader.read_query(f"{query} WHERE {sk_col} > {int(cached[sk_col].max())}")
+            if not delta.empty:
+                _dim_cache[key] = pd.concat([cached, delta], ignore_index=True)
+    if _dim_cache['fee'] is None:
+        _dim_cache['fee'] = sql_reader.read_query("SELECT late_fee_sk, duration_months FROM dim_late_fee")
+    return _dim_cache['cust'], _dim_cache['pol'], _dim_cache['addr'], _dim_cache['fee']
+
+
+@lru_cache(maxsize=1)
+def _build_dim_late_fee():
+    """The 61-row late-fee rule table (static reference data)."""
+    dim = pd.DataFrame({'duration_months': pd.Series(range(0, 61), dtype='int8')})
+    dim['penalty_percent'] = dim['duration_months'].astype('float32') * 0.005
+    dim['description'] = dim['duration_months'].astype(str) + " Months Delay"
+    return dim
+
+
+def _ensure_dim_late_fee(run_ts: pd.Timestamp = None):
+    """
+    Loads the static late-fee rule table once per pipeline run. The
+    has_rows probe skips the write entirely on an already-initialized
+    warehouse; the upsert (INSERT IGNORE) keeps a concurrent first run
+    idempotent instead of swallowing duplicate-key errors blindly.
+    """
+    loader = _get_loader()
+    try:
+        if loader.has_rows('dim_late_fee'):
+            return
+    except Exception as e:
+        logger.warning(f"Could not probe dim_late_fee ({e}). Attempting load.")
+    dim = _build_dim_late_fee().copy()
+    dim['created_at'] = run_ts if run_ts is not None else pd.Timestamp.now()
+    try:
+        loader.upsert(dim, 'dim_late_fee')
+    except Exception as e:
+        logger.error(f"dim_late_fee load failed: {e}")
 
+def transform_batch(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Steps 2 (Standardization) through 4.6 (Late Fees) for one frame.
+    Pure per-row work with no shared state, so callers can run it on
+    several source files in parallel and concat afterwards.
+    """
     # 2. STANDARDIZATION (Column Names)
     # ---------------------------------------------------------
     logger.info("Step 2: Standardization")
@@ -53,13 +163,11 @@ def process_batch(df: pd.DataFrame, batch_name: str = "Unknown"):
     }
     df = df.rename(columns=rename_map)
 
-    # 4.2.1 Enforce String Types for IDs
-    for col in ['policy_id', 'policy_type_id', 'customer_id']:
-        if col in df.columns:
-            df[col] = df[col].fillna('').astype(str).str.strip()
+    # 4.2.1 Enforce String Types for IDs (Arrow-backed when available)
+    df = Standardizer.enforce_string_ids(df, ['policy_id', 'policy_type_id', 'customer_id'])
 
-    # 4.3 Clean Strings
-    df = Standardizer.trim_strings(df)
+    # 4.3 Clean Strings (whitelist: only the columns the splits consume)
+    df = Standardizer.trim_strings(df, cols=TRIM_COLS)
     
     # NEW: Standardize Country
     df = Standardizer.clean_country(df, col='country')
@@ -78,41 +186,83 @@ def process_batch(df: pd.DataFrame, batch_name: str = "Unknown"):
     
     # 4.6 Calculate Late Fees
     df = Transformer.calculate_late_fees(df)
+    return df
+
+
+def _read_and_transform(path: str) -> pd.DataFrame:
+    """Reads one source file and runs the per-file transform stage."""
+    df = FileIngestor._read_one(path)
+    if df is None or df.empty:
+        return None
+    return transform_batch(df)
+
+
+def process_batch_stage(df: pd.DataFrame, batch_name: str = "Unknown", run_ts: pd.Timestamp = None,
+                        transformed: bool = False):
+    """
+    Order-independent half of a batch: Steps 2 (Standardization) through
+    6 (Staging) plus the non-customer dims. Everything here is
+    append-only, so batches for different days can run concurrently.
+    Returns (df, now_ts, first_customer) for process_batch_scd2, or None
+    for an empty batch.
+    run_ts lets the caller pin one timestamp for the whole pipeline run;
+    transformed=True skips steps 2-4.6 for frames already cleaned per file.
+    """
+    logger.info(f"--- Processing Batch: {batch_name} (Rows: {len(df)}) ---")
+
+    if not transformed:
+        df = transform_batch(df)
+
+    if df.empty:
+        logger.warning(f"Batch {batch_name} was empty.")
+        return None
 
     # 5. PREPARE FOR STAGING
     # ---------------------------------------------------------
-    df['ingestion_date'] = datetime.now()
+    # One cached timestamp per run: each datetime.now() assignment
+    # broadcasts a fresh Python datetime across every row, so reuse a
+    # single Timestamp for ingestion_date and all created_at columns.
+    now_ts = run_ts if run_ts is not None else pd.Timestamp.now()
+    df['ingestion_date'] = now_ts
     if 'source_file' not in df.columns:
         df['source_file'] = 'unknown'
-        
-    if 'actual_premium_paid_dt' in df.columns:
-        df['txn_date'] = df['actual_premium_paid_dt']
-    
-    if 'premium_amt' in df.columns:
-        df['premium_amount'] = df['premium_amt']
-    
-    if 'premium_amt_paid_tilldate' in df.columns:
-        df['premium_paid_tilldate'] = df['premium_amt_paid_tilldate']
+
+    # Low-cardinality strings repeat across every staging/DWH table —
+    # categoricals store integer codes, shrinking memory and speeding the
+    # drop_duplicates/groupby passes in Step 7.
+    categorical_cols = ['region', 'source_file', 'gender', 'marital_status',
+                        'policy_type_name', 'customer_segment', 'country']
+    for col in categorical_cols:
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+
+    # Staging/fact aliases are applied by rename on each split slice
+    # below (renames share the column blocks) instead of materializing
+    # duplicate columns on the parent frame.
+    alias_map = {
+        'actual_premium_paid_dt': 'txn_date',
+        'premium_amt': 'premium_amount',
+        'premium_amt_paid_tilldate': 'premium_paid_tilldate',
+        'policy_type_name': 'policy_type',
+    }
 
 
     # 6. LOADING (Staging Layer)
     # ---------------------------------------------------------
     logger.info("Step 6: Loading Staging Layer")
-    loader = Loader(db_type='mysql')
+    loader = _get_loader()
     
     stg_cust = Transformer.split_dataframe(df, [
         'customer_id', 'customer_name', 'customer_segment', 'marital_status', 'gender', 
         'dob', 'effective_start_dt', 'effective_end_dt', 'region', 'ingestion_date', 'source_file'
     ])
     
-    df['policy_type'] = df.get('policy_type_name') 
-    
     stg_pol = Transformer.split_dataframe(df, [
-        'policy_id', 'policy_name', 'policy_type_id', 'policy_type', 'policy_type_desc', 
-        'policy_term', 'policy_start_dt', 'policy_end_dt', 'total_policy_amt', 'premium_amt', 
-        'next_premium_dt', 'actual_premium_paid_dt', 'premium_amt_paid_tilldate', 
+        'policy_id', 'policy_name', 'policy_type_id', 'policy_type_name', 'policy_type_desc',
+        'policy_term', 'policy_start_dt', 'policy_end_dt', 'total_policy_amt', 'premium_amt',
+        'next_premium_dt', 'actual_premium_paid_dt', 'premium_amt_paid_tilldate',
         'customer_id', 'region', 'ingestion_date', 'source_file'
-    ])
+    ]).rename(columns={'policy_type_name': 'policy_type'})
 
     stg_addr = Transformer.split_dataframe(df, [
         'customer_id', 'country', 'region', 'state_province', 'city', 'postal_code', 
@@ -120,48 +270,108 @@ def process_batch(df: pd.DataFrame, batch_name: str = "Unknown"):
     ])
     
     stg_txn = Transformer.split_dataframe(df, [
-        'policy_id', 'customer_id', 'txn_date', 'premium_amount', 'premium_paid_tilldate', 
+        'policy_id', 'customer_id', 'actual_premium_paid_dt', 'premium_amt',
+        'premium_amt_paid_tilldate',
         'total_policy_amt', 'region', 'ingestion_date', 'source_file'
-    ])
-
-    loader.load_to_db(stg_cust, 'stg_customers', if_exists='append')
-    loader.load_to_db(stg_pol, 'stg_policy', if_exists='append')
-    loader.load_to_db(stg_addr, 'stg_address', if_exists='append')
-    loader.load_to_db(stg_txn, 'stg_transactions', if_exists='append')
+    ]).rename(columns=alias_map)
+
+    # The four staging tables are independent — load them in parallel so
+    # MySQL overlaps the four write streams (engine pool covers 4 workers).
+    staging_tasks = [
+        (stg_cust, 'stg_customers'),
+        (stg_pol, 'stg_policy'),
+        (stg_addr, 'stg_address'),
+        (stg_txn, 'stg_transactions'),
+    ]
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        list(executor.map(lambda t: loader.load_to_db(t[0], t[1], if_exists='append'), staging_tasks))
 
 
     # 7. LOADING (DWH Layer)
     # ---------------------------------------------------------
     logger.info("Step 7: Loading DWH Layer (Dimensions & Facts)")
 
+    # One duplicated() hash pass per key set, computed on the parent df
+    # and reused below — each dim is then a plain mask slice instead of
+    # its own drop_duplicates over a staging copy.
+    first_pol_type = ~df.duplicated('policy_type_id')
+    first_policy = ~df.duplicated(['policy_id', 'policy_type_name', 'policy_start_dt'])
+    first_customer = ~df.duplicated('customer_id')
+    first_address = ~df.duplicated(['customer_id', 'postal_code'])
+
     # 7.1 Dim Policy Type
     # Need unique policy_type_id
-    dim_pol_type = df[['policy_type_id', 'policy_type_name', 'policy_type_desc']].drop_duplicates('policy_type_id')
-    dim_pol_type = dim_pol_type.groupby('policy_type_id').first().reset_index()
-    
-    # Check existing or just try-except (Simpler for batch idempotency)
-    try:
-        loader.load_to_db(dim_pol_type, 'dim_policy_type', if_exists='append')
-    except Exception as e:
-        logger.warning(f"Dim Policy Type load warning (likely duplicates): {e}")
-        # Proceed, as data is likely already there
-    
+    dim_pol_type = df.loc[first_pol_type, ['policy_type_id', 'policy_type_name', 'policy_type_desc']]
+
     # 7.2 Dim Policy
     # Allow history: Deduplicate by ID + Type + StartDate (Composite uniqueness)
-    dim_policy = stg_pol[['policy_id', 'policy_name', 'policy_type_id', 'policy_type', 'policy_term', 'policy_start_dt', 'policy_end_dt', 'total_policy_amt']].drop_duplicates(['policy_id', 'policy_type', 'policy_start_dt'])
-    dim_policy['created_at'] = datetime.now()
-    try:
-        loader.load_to_db(dim_policy, 'dim_policy', if_exists='append')
-    except Exception as e:
-        logger.warning(f"Dim Policy load warning (duplicates or constraint): {e}")
-    
+    dim_policy = df.loc[first_policy, ['policy_id', 'policy_name', 'policy_type_id', 'policy_type_name', 'policy_term', 'policy_start_dt', 'policy_end_dt', 'total_policy_amt']].rename(columns={'policy_type_name': 'policy_type'})
+    dim_policy['created_at'] = now_ts
+
+    # 7.4 Dim Address
+    dim_addr = df.loc[first_address, ['customer_id', 'country', 'region', 'state_province', 'city', 'postal_code']].copy()
+    dim_addr['created_at'] = now_ts
+
+    # Dedup against existing rows happens in SQL (INSERT IGNORE on each
+    # dim's natural key) so re-runs are idempotent without the old
+    # append-and-swallow-PK-errors workaround. The dims have no
+    # dependency on the SCD2 customer path — load them in parallel.
+    # (dim_late_fee is static and loaded once per run in run_pipeline.)
+    def _load_dim(frame, table):
+        try:
+            loader.upsert(frame, table)
+        except Exception as e:
+            logger.warning(f"{table} upsert failed ({e}). Falling back to append.")
+            try:
+                loader.load_to_db(frame, table, if_exists='append')
+            except Exception as e2:
+                logger.warning(f"{table} load warning (likely duplicates): {e2}")
+                # Proceed, as data is likely already there
+
+    dim_tasks = [(dim_pol_type, 'dim_policy_type'), (dim_policy, 'dim_policy'),
+                 (dim_addr, 'dim_address')]
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        list(executor.map(lambda t: _load_dim(*t), dim_tasks))
+
+    return df, now_ts, first_customer
+
+
+def process_batch_scd2(df: pd.DataFrame, now_ts: pd.Timestamp, first_customer: pd.Series,
+                       batch_name: str = "Unknown"):
+    """
+    Order-dependent half of a batch: Dim Customer SCD Type 2 (7.3) and
+    the fact load (7.6). Must run in day order — each day's fact rows
+    link against the customer versions created by the previous days.
+    """
+    logger.info(f"--- SCD2/Fact Phase: {batch_name} ---")
+    loader = _get_loader()
+
     # 7.3 Dim Customer (SCD Type 2)
-    dim_cust_new = stg_cust[['customer_id', 'customer_name', 'customer_segment', 'marital_status', 'gender', 'region', 'effective_start_dt']].drop_duplicates('customer_id')
-    
-    sql_reader = SQLIngestor(db_type='mysql')
-    
+    # One slice off the shared first_customer mask carries dob along, so
+    # the insert path below needs no second dedup slice + merge to
+    # attach it.
+    dim_cust_new = df.loc[first_customer, ['customer_id', 'customer_name', 'customer_segment', 'marital_status', 'gender', 'dob', 'region', 'effective_start_dt']]
+
+    sql_reader = _get_sql_reader()
+
     try:
-        existing_cust = sql_reader.read_query("SELECT customer_sk, customer_id, customer_name, customer_segment, marital_status, region FROM dim_customer WHERE current_flag = 1")
+        # Only the batch's customers can change — restrict the current-
+        # version scan to their IDs so the query is O(batch) instead of
+        # O(all customers ever seen) on every day.
+        batch_ids = dim_cust_new['customer_id'].dropna().astype(str).unique()
+        if len(batch_ids):
+            # Bound expanding parameter: the driver escapes the
+            # CSV-sourced IDs, and chunking keeps each IN list bounded.
+            stmt = text(
+                "SELECT customer_sk, customer_id, customer_name, customer_segment, marital_status, region "
+                "FROM dim_customer WHERE current_flag = 1 AND customer_id IN :ids"
+            ).bindparams(bindparam('ids', expanding=True))
+            parts = [sql_reader.read_query(stmt, params={'ids': list(batch_ids[i:i + 1000])})
+                     for i in range(0, len(batch_ids), 1000)]
+            existing_cust = pd.concat(parts, ignore_index=True) if len(parts) > 1 else parts[0]
+        else:
+            existing_cust = pd.DataFrame()
         if 'customer_id' in existing_cust.columns:
             existing_cust['customer_id'] = existing_cust['customer_id'].astype(str)
     except Exception as e:
@@ -188,50 +398,47 @@ def process_batch(df: pd.DataFrame, batch_name: str = "Unknown"):
             compare_cols=compare_cols
         )
 
-    if not to_update.empty:
-        logger.info(f"Expiring {len(to_update)} old customer records...")
-        from sqlalchemy import text
-        with loader.engine.connect() as conn:
-            for index, row in to_update.iterrows():
-                stmt = text(f"UPDATE dim_customer SET current_flag = 0, eff_end_dt = :end_dt WHERE customer_sk = :sk")
-                conn.execute(stmt, {'end_dt': row['eff_end_dt'], 'sk': row['customer_sk']})
-                conn.commit()
-
     if not to_insert.empty:
-        dob_lookup = stg_cust[['customer_id', 'dob']].drop_duplicates('customer_id')
-        to_insert = pd.merge(to_insert, dob_lookup, on='customer_id', how='left')
-        to_insert['created_at'] = datetime.now()
+        to_insert['created_at'] = now_ts
         cols_to_load = ['customer_id', 'customer_name', 'customer_segment', 'marital_status', 'gender', 'dob', 'eff_start_dt', 'eff_end_dt', 'current_flag', 'region', 'created_at']
         for c in cols_to_load:
             if c not in to_insert.columns:
-                to_insert[c] = None 
-        loader.load_to_db(to_insert[cols_to_load], 'dim_customer', if_exists='append')
-
-    # 7.4 Dim Address
-    dim_addr = stg_addr[['customer_id', 'country', 'region', 'state_province', 'city', 'postal_code']].drop_duplicates(['customer_id', 'postal_code'])
-    dim_addr['created_at'] = datetime.now()
-    loader.load_to_db(dim_addr, 'dim_address', if_exists='append')
-    
-    # 7.5 Dim Late Fee
-    fee_range = range(0, 61)
-    dim_late_fee = pd.DataFrame({'duration_months': fee_range})
-    dim_late_fee['penalty_percent'] = dim_late_fee['duration_months'] * 0.005
-    dim_late_fee['description'] = dim_late_fee['duration_months'].astype(str) + " Months Delay"
-    dim_late_fee['created_at'] = datetime.now()
-    try:
-        loader.load_to_db(dim_late_fee, 'dim_late_fee', if_exists='append') 
-    except Exception:
-        pass 
+                to_insert[c] = None
+
+    # Expire old versions and insert the new ones in one transaction:
+    # a single commit (one fsync) instead of one per statement, and a
+    # failed insert rolls the expiry back rather than leaving customers
+    # with no current version.
+    if not to_update.empty or not to_insert.empty:
+        with loader.engine.begin() as conn:
+            if not to_update.empty:
+                logger.info(f"Expiring {len(to_update)} old customer records...")
+                # Stage the expiring SKs in a temp table and update with
+                # one UPDATE...JOIN: the insert batches into multi-row
+                # statements, so the expiry costs a couple of round trips
+                # instead of one UPDATE per surrogate key. TEMPORARY
+                # tables are connection-scoped, so this stays inside the
+                # transaction's connection and vanishes with it.
+                conn.execute(text(
+                    "CREATE TEMPORARY TABLE _tmp_expire_cust "
+                    "(sk INT PRIMARY KEY, end_dt DATE)"))
+                conn.execute(
+                    text("INSERT INTO _tmp_expire_cust (sk, end_dt) VALUES (:sk, :end_dt)"),
+                    [{'sk': row.customer_sk, 'end_dt': row.eff_end_dt}
+                     for row in to_update.itertuples(index=False)])
+                conn.execute(text(
+                    "UPDATE dim_customer d JOIN _tmp_expire_cust t ON d.customer_sk = t.sk "
+                    "SET d.current_flag = 0, d.eff_end_dt = t.end_dt"))
+                conn.execute(text("DROP TEMPORARY TABLE _tmp_expire_cust"))
+            if not to_insert.empty:
+                loader.load_to_db(to_insert[cols_to_load], 'dim_customer', if_exists='append', con=conn)
 
-    # 7.6 Fact Policy Txn
     # 7.6 Fact Policy Txn
     try:
-        current_date_str = datetime.now().strftime('%Y-%m-%d')
-        # Optimized Fetch: Map Ids
-        map_cust = sql_reader.read_query("SELECT customer_sk, customer_id, eff_start_dt, eff_end_dt FROM dim_customer")
-        map_pol = sql_reader.read_query("SELECT policy_sk, policy_id FROM dim_policy")
-        map_addr = sql_reader.read_query("SELECT address_sk, customer_id, postal_code FROM dim_address")
-        map_fee = sql_reader.read_query("SELECT late_fee_sk, duration_months FROM dim_late_fee")
+        current_date_str = now_ts.strftime('%Y-%m-%d')
+        # Optimized Fetch: Map Ids — cached across batches, only the
+        # rows inserted since the previous batch are pulled from MySQL.
+        map_cust, map_pol, map_addr, map_fee = _get_dim_maps(sql_reader)
     except Exception as e:
         logger.error(f"Failed to fetch dimension maps for Fact linking: {e}")
         return
@@ -239,45 +446,97 @@ def process_batch(df: pd.DataFrame, batch_name: str = "Unknown"):
     # B. Map Customer SK (SCD Type 2 Linkage)
     # Ensure types match for merge (DB returns valid types, DF has strings)
     # Map Cust
-    map_cust['customer_id'] = map_cust['customer_id'].astype(str)
-    # Normalize ID in DF to ensure match
-    if 'customer_id' in df.columns:
-        df['customer_id'] = df['customer_id'].astype(str)
-    
-    # Map Pol
-    map_pol['policy_id'] = map_pol['policy_id'].astype(str)
-    map_addr['customer_id'] = map_addr['customer_id'].astype(str)
-    if 'postal_code' in map_addr.columns:
-        map_addr['postal_code'] = map_addr['postal_code'].astype(str)
-
-    df_merged = pd.merge(df, map_cust, on='customer_id', how='left')
-    df_merged['txn_date'] = pd.to_datetime(df_merged['txn_date'], errors='coerce')
-    df_merged['eff_start_dt'] = pd.to_datetime(df_merged['eff_start_dt'], errors='coerce')
-    df_merged['eff_end_dt'] = pd.to_datetime(df_merged['eff_end_dt'], errors='coerce')
-    df_merged['eff_end_dt'] = df_merged['eff_end_dt'].fillna(pd.Timestamp.max)
-    
-    # Link to SCD2 Version
-    mask = (df_merged['txn_date'] >= df_merged['eff_start_dt']) & (df_merged['txn_date'] <= df_merged['eff_end_dt'])
-    fact_data = df_merged[mask].copy()
+    # Normalize IDs on both sides with the same Arrow-backed string cast
+    # so the merges hash fixed-layout keys rather than Python objects.
+    map_cust = Standardizer.enforce_string_ids(map_cust, ['customer_id'])
+    df = Standardizer.enforce_string_ids(df, ['customer_id'])
 
+    # Map Pol
+    map_pol = Standardizer.enforce_string_ids(map_pol, ['policy_id'])
+    map_addr = Standardizer.enforce_string_ids(map_addr, ['customer_id', 'postal_code'])
+
+    # Merge only the columns the fact table needs — carrying the full
+    # wide frame through the SCD2 merge multiplies every unused column
+    # by the customer history depth. Drop the wide frame before merging.
+    fact_cols = ['customer_id', 'policy_id', 'postal_code', 'actual_premium_paid_dt',
+                 'late_duration_months', 'premium_amt', 'premium_amt_paid_tilldate',
+                 'total_policy_amt', 'late_fee_amount', 'region', 'ingestion_date']
+    df_slim = df.reindex(columns=[c for c in fact_cols if c in df.columns], copy=False).rename(
+        columns={'actual_premium_paid_dt': 'txn_date',
+                 'premium_amt_paid_tilldate': 'premium_paid_tilldate'})
+    del df
+    gc.collect()
+
+    # Link to SCD2 Version: merge_asof picks the latest version with
+    # eff_start_dt <= txn_date per customer directly, instead of joining
+    # every version (rows x history depth) and masking afterwards.
+    # Coerce only when needed: txn_date was parsed in step 4.4 and the
+    # cached map_cust keeps datetime64 across batches, so the casts are
+    # no-ops except on the first batch / freshly fetched delta rows.
+    if not pd.api.types.is_datetime64_any_dtype(df_slim['txn_date']):
+        df_slim = df_slim.assign(txn_date=pd.to_datetime(df_slim['txn_date'], errors='coerce'))
+    if not pd.api.types.is_datetime64_any_dtype(map_cust['eff_start_dt']):
+        map_cust['eff_start_dt'] = pd.to_datetime(map_cust['eff_start_dt'], errors='coerce')
+    if not pd.api.types.is_datetime64_any_dtype(map_cust['eff_end_dt']):
+        map_cust['eff_end_dt'] = pd.to_datetime(map_cust['eff_end_dt'], errors='coerce')
+
+    left = df_slim[df_slim['txn_date'].notna()].sort_values('txn_date')
+    right = map_cust[map_cust['eff_start_dt'].notna()].sort_values('eff_start_dt')
+    df_merged = pd.merge_asof(
+        left, right,
+        left_on='txn_date', right_on='eff_start_dt',
+        by='customer_id', direction='backward'
+    )
+    # Window check on int64 views of the datetimes: NaT is INT64_MIN, so
+    # open-ended versions ('9999-12-31' coerces to NaT past the ns range)
+    # are treated as "no upper bound" via the sentinel compare — no
+    # fillna(Timestamp.max) copy, one fused numpy pass for the mask.
+    txn_i8 = df_merged['txn_date'].to_numpy('datetime64[ns]').view('i8')
+    end_i8 = df_merged['eff_end_dt'].to_numpy('datetime64[ns]').view('i8')
+    nat_i8 = np.iinfo(np.int64).min
+    in_window = df_merged['customer_sk'].notna().to_numpy() & (
+        (txn_i8 <= end_i8) | (end_i8 == nat_i8))
+    fact_data = df_merged[in_window].copy()
+
+    # SK lookups via Series.map instead of chained left-merges — each
+    # merge rebuilt the whole fact frame (copying every already-joined
+    # column); .map assigns one new column per dim with a single
+    # hashtable probe per row. Maps are deduped on their natural key so
+    # a duplicate dim row can no longer fan out fact rows.
     # Map Policy
     if 'policy_id' in fact_data.columns:
-        fact_data['policy_id'] = fact_data['policy_id'].astype(str)
-        fact_data = pd.merge(fact_data, map_pol, on='policy_id', how='left')
+        fact_data = Standardizer.enforce_string_ids(fact_data, ['policy_id'])
+        pol_sk = map_pol.drop_duplicates('policy_id').set_index('policy_id')['policy_sk']
+        fact_data['policy_sk'] = fact_data['policy_id'].map(pol_sk)
 
     # Map Address
     if 'postal_code' in fact_data.columns:
-        fact_data['postal_code'] = fact_data['postal_code'].fillna('').astype(str).replace(r'\.0$', '', regex=True)
-        fact_data = pd.merge(fact_data, map_addr, on=['customer_id', 'postal_code'], how='left')
+        # postal_code is read as string at ingestion (never inferred as
+        # float), so no trailing-'.0' repair pass is needed here.
+        fact_data['postal_code'] = fact_data['postal_code'].fillna('').astype(str)
+        addr_sk = (map_addr.drop_duplicates(['customer_id', 'postal_code'])
+                   .set_index(['customer_id', 'postal_code'])['address_sk'])
+        fact_data['address_sk'] = pd.MultiIndex.from_frame(
+            fact_data[['customer_id', 'postal_code']]).map(addr_sk)
     elif 'customer_id' in fact_data.columns:
-         fact_data = pd.merge(fact_data, map_addr, on='customer_id', how='left')
+        addr_sk = map_addr.drop_duplicates('customer_id').set_index('customer_id')['address_sk']
+        fact_data['address_sk'] = fact_data['customer_id'].map(addr_sk)
 
     # Map Late Fee
     if 'late_duration_months' in fact_data.columns:
-        fact_data = pd.merge(fact_data, map_fee, left_on='late_duration_months', right_on='duration_months', how='left')
-
-    # Date SK
-    fact_data['date_sk'] = fact_data['txn_date'].dt.strftime('%Y%m%d').fillna(0).astype(int)
+        fee_sk = map_fee.drop_duplicates('duration_months').set_index('duration_months')['late_fee_sk']
+        fact_data['late_fee_sk'] = fact_data['late_duration_months'].map(fee_sk)
+
+    # Date SK — pure numpy datetime64 unit arithmetic: year/month/day
+    # fall out of [Y]/[M]/[D] casts with no per-row Python objects and
+    # no .dt accessor passes. NaT rows get the 0 sentinel.
+    d64 = fact_data['txn_date'].to_numpy(dtype='datetime64[D]')
+    m64 = d64.astype('datetime64[M]')
+    date_sk = ((m64.astype('datetime64[Y]').astype('int32') + 1970) * 10000
+               + (m64.astype('int32') % 12 + 1) * 100
+               + (d64 - m64).astype('int32') + 1)
+    date_sk[np.isnat(d64)] = 0
+    fact_data['date_sk'] = date_sk
 
     final_cols = [
         'customer_sk', 'policy_sk', 'address_sk', 'late_fee_sk', 'date_sk', 
@@ -287,19 +546,35 @@ def process_batch(df: pd.DataFrame, batch_name: str = "Unknown"):
     if 'late_fee_amount' in fact_data.columns:
         fact_data = fact_data.rename(columns={'late_fee_amount': 'late_fee'})
     
-    for c in final_cols:
-        if c not in fact_data.columns:
-            fact_data[c] = None
+    # reindex adds the absent columns as typed NaN in one pass; the old
+    # per-column `= None` broadcast created object-dtype columns.
+    missing = [c for c in final_cols if c not in fact_data.columns]
+    if missing:
+        fact_data = fact_data.reindex(columns=fact_data.columns.tolist() + missing)
 
     loader.load_to_db(fact_data[final_cols], 'fact_policy_txn', if_exists='append')
     logger.info(f"Batch {batch_name} Load Complete.")
 
 
+def process_batch(df: pd.DataFrame, batch_name: str = "Unknown", run_ts: pd.Timestamp = None,
+                  transformed: bool = False):
+    """
+    Full processing for a single dataframe/batch: the stage phase
+    followed immediately by the SCD2/fact phase.
+    """
+    staged = process_batch_stage(df, batch_name=batch_name, run_ts=run_ts, transformed=transformed)
+    if staged is None:
+        return
+    df, now_ts, first_customer = staged
+    process_batch_scd2(df, now_ts, first_customer, batch_name=batch_name)
+
+
 def run_pipeline(source_folder='data'):
     """
     Runs the ETL pipeline sequentially by Day (0, 1, 2...).
     """
     logger.info(f"Starting Sequential ETL Pipeline. Source: {source_folder}")
+    run_ts = pd.Timestamp.now()
     
     # 1. Initialize Ingestor & Extract ZIPs
     ingestor = FileIngestor()
@@ -318,47 +593,67 @@ def run_pipeline(source_folder='data'):
     # So if we assume at least one file exists, we can run it. 
     # Or better: Just use glob in 'run_pipeline' to find zips and use Ingestor.extract_zip
     
-    zip_files = glob.glob(os.path.join(source_folder, "*.zip"))
+    with os.scandir(source_folder) as it:
+        zip_files = [e.path for e in it if e.is_file() and e.name.endswith('.zip')]
     for zf in zip_files:
         FileIngestor.extract_zip(zf, source_folder)
 
     # 2. Identify Unique Days from CSVs
-    # Pattern: ..._dayX.csv
-    # We search recursively or flat? 'data' usually flat or regional folders?
-    # User showed: data/Insurance_details_US_Central_day0.csv. 
-    # Flat structure in data/ after unzip.
-    
-    all_files = glob.glob(os.path.join(source_folder, "*_day*.csv"))
-    
-    days = set()
-    for f in all_files:
-        # Regex to find day number
-        match = re.search(r'day(\d+)\.csv$', f, re.IGNORECASE)
-        if match:
-            days.add(int(match.group(1)))
-            
-    sorted_days = sorted(list(days))
+    # Pattern: ..._dayX.csv (flat structure in data/ after unzip).
+    # One scandir pass after extraction: scandir skips the per-file
+    # stat() that glob performs, and grouping files by day here removes
+    # the per-day regex rescan of the whole listing later.
+    files_by_day = {}
+    with os.scandir(source_folder) as it:
+        for entry in it:
+            if not entry.is_file():
+                continue
+            match = _DAY_RE.search(entry.name)
+            if match:
+                files_by_day.setdefault(int(match.group(1)), []).append(entry.path)
+
+    sorted_days = sorted(files_by_day)
     logger.info(f"Found Days to Process: {sorted_days}")
-    
+
+    # Static 61-row rule table: one load per run, not one per batch.
+    _ensure_dim_late_fee(run_ts)
+
     if not sorted_days:
         logger.warning("No day-patterned files found. Running legacy mode (all files).")
         df = ingestor.read_folder(source_folder)
-        process_batch(df, "Legacy-All")
+        process_batch(df, "Legacy-All", run_ts=run_ts)
         return
 
     # 3. Process Chronologically
-    for day in sorted_days:
-        pattern = f"*day{day}.csv"
+    # The stage phase (staging tables + non-customer dims) is append-only
+    # and independent across days, so days run concurrently on a small
+    # pool; the SCD2/fact phase is order-dependent (each day's facts
+    # link against customer versions from prior days) and runs
+    # sequentially in day order afterwards.
+    def _stage_day(day):
         logger.info(f"=== Starting Batch: DAY {day} ===")
-        
-        # Read only files for this day
-        # Ingestor.read_folder accepts pattern.
-        df_batch = ingestor.read_folder(source_folder, file_pattern=pattern)
-        
-        if not df_batch.empty:
-            process_batch(df_batch, batch_name=f"Day {day}")
-        else:
+
+        # Read + transform each of the day's files in parallel (steps
+        # 2-4.6 are per-row with no shared state), then concat once.
+        day_files = files_by_day[day]
+        with ThreadPoolExecutor(max_workers=min(len(day_files), os.cpu_count() or 4)) as executor:
+            frames = [f for f in executor.map(_read_and_transform, day_files)
+                      if f is not None and not f.empty]
+        df_batch = pd.concat(frames, ignore_index=True, copy=False) if frames else pd.DataFrame()
+
+        if df_batch.empty:
             logger.warning(f"Batch Day {day} was empty.")
+            return None
+        return process_batch_stage(df_batch, batch_name=f"Day {day}", run_ts=run_ts, transformed=True)
+
+    with ThreadPoolExecutor(max_workers=min(len(sorted_days), 4)) as executor:
+        staged = list(executor.map(_stage_day, sorted_days))
+
+    for day, result in zip(sorted_days, staged):
+        if result is None:
+            continue
+        df_batch, now_ts, first_customer = result
+        process_batch_scd2(df_batch, now_ts, first_customer, batch_name=f"Day {day}")
             
     logger.info("Sequential Pipeline Complete.")
 
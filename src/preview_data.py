@@ -1,6 +1,6 @@
 import os
 import pandas as pd
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, text
 from urllib.parse import quote_plus
 
 # Database Connection
@@ -14,12 +14,25 @@ encoded_password = quote_plus(password)
 conn_str = f"mysql+mysqlconnector://{user}:{encoded_password}@{host}:{port}/{db_name}"
 engine = create_engine(conn_str)
 
+# Columns worth showing per table — SELECT * would also drag wide TEXT
+# columns across the wire just to print a five-row preview.
+PREVIEW_COLS = {
+    'dim_customer': ['customer_sk', 'customer_id', 'customer_name',
+                     'customer_segment', 'region', 'eff_start_dt',
+                     'eff_end_dt', 'current_flag'],
+    'fact_policy_txn': ['customer_sk', 'policy_sk', 'address_sk',
+                        'late_fee_sk', 'date_sk', 'premium_amt',
+                        'late_fee', 'region'],
+}
+
 def preview_table(table_name, limit=5):
     print(f"\n{'='*50}")
     print(f"👀 PREVIEW: {table_name} (Top {limit})")
     print(f"{'='*50}")
     try:
-        df = pd.read_sql(f"SELECT * FROM {table_name} LIMIT {limit}", engine)
+        cols = ", ".join(PREVIEW_COLS.get(table_name, ['*']))
+        df = pd.read_sql(text(f"SELECT {cols} FROM {table_name} LIMIT :n"),
+                         engine, params={'n': limit})
         if df.empty:
             print("No data found.")
         else:
@@ -28,5 +41,6 @@ def preview_table(table_name, limit=5):
         print(f"❌ Error: {e}")
 
 # Preview key tables
-preview_table('dim_customer')
-preview_table('fact_policy_txn')
+if __name__ == '__main__':
+    preview_table('dim_customer')
+    preview_table('fact_policy_txn')
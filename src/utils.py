@@ -1,27 +1,36 @@
 import logging
 import os
 import yaml
+from functools import lru_cache
 from pathlib import Path
 from sqlalchemy import create_engine
 
 # --- Logging Setup ---
+# One shared formatter instance: setup_logger runs at import time in
+# several modules and there is no reason to rebuild it per call.
+_LOG_FORMATTER = logging.Formatter('%(asctime)s %(levelname)s %(message)s')
+
 def setup_logger(name: str, log_file: str = 'logs/pipeline.log', level=logging.INFO):
     """Function to setup as many loggers as you want"""
-    formatter = logging.Formatter('%(asctime)s %(levelname)s %(message)s')
-    
+    logger = logging.getLogger(name)
+    # Re-imports (or repeated setup calls) must not stack extra handler
+    # chains — duplicate handlers mean every record is written N times.
+    if logger.hasHandlers():
+        return logger
+
     os.makedirs(os.path.dirname(log_file), exist_ok=True)
-    
-    handler = logging.FileHandler(log_file)        
-    handler.setFormatter(formatter)
+
+    # delay=True defers the open() until the first record is emitted.
+    handler = logging.FileHandler(log_file, delay=True)
+    handler.setFormatter(_LOG_FORMATTER)
 
     console_handler = logging.StreamHandler()
-    console_handler.setFormatter(formatter)
+    console_handler.setFormatter(_LOG_FORMATTER)
 
-    logger = logging.getLogger(name)
     logger.setLevel(level)
     logger.addHandler(handler)
     logger.addHandler(console_handler)
-    
+
     return logger
 
 logger = setup_logger('etl_utils')
@@ -36,6 +45,26 @@ def load_config(config_path: str = 'config.yaml'):
         return yaml.safe_load(file)
 
 # --- Database Connection ---
+@lru_cache(maxsize=None)
+def _cached_engine(conn_str: str, local_infile: bool = False):
+    """
+    One pooled engine per connection string, shared across
+    Loader/SQLIngestor instances. Pool sized for the four concurrent
+    staging loads plus dimension reads. local_infile enables the client
+    side of LOAD DATA LOCAL INFILE for the Loader bulk path.
+    """
+    connect_args = {'allow_local_infile': True} if local_infile else {}
+    return create_engine(
+        conn_str,
+        pool_size=10,
+        max_overflow=20,
+        pool_timeout=30,
+        pool_pre_ping=True,
+        pool_recycle=1800,
+        insertmanyvalues_page_size=10000,
+        connect_args=connect_args,
+    )
+
 def get_db_connection(db_type='mysql', config=None):
     """
     Factory to get database connection engine.
@@ -62,13 +91,13 @@ def get_db_connection(db_type='mysql', config=None):
         encoded_pass = quote_plus(password)
         conn_str = f"mysql+mysqlconnector://{user}:{encoded_pass}@{host}:{port}/{db_name}"
         try:
-            engine = create_engine(conn_str)
+            engine = _cached_engine(conn_str, local_infile=True)
             logger.info(f"Connected to MySQL database: {db_name} at {host}")
             return engine
         except Exception as e:
             logger.error(f"Failed to connect to MySQL: {e}")
             raise e
     elif db_type == 'sqlite':
-        return create_engine(f'sqlite:///{db_name}.db')
+        return _cached_engine(f'sqlite:///{db_name}.db')
     else:
         raise ValueError(f"Unsupported DB type: {db_type}")
@@ -33,7 +33,11 @@ class Validator:
         Checks if keys in fact table exist in dimension table.
         Returns: DataFrame of orphaned records (facts with no matching dim).
         """
-        orphans = fact_df[~fact_df[fact_key].isin(dim_df[dim_key])]
+        # One Index build per call (a single pass, like the old isin),
+        # then get_indexer probes its hash table once per fact row;
+        # -1 marks keys with no dimension match.
+        dim_idx = pd.Index(dim_df[dim_key]).unique()
+        orphans = fact_df[dim_idx.get_indexer(fact_df[fact_key]) == -1]
         if not orphans.empty:
             logger.warning(f"Referential Integrity Failed: {len(orphans)} rows in fact table have no match in dimension.")
         else:
@@ -43,12 +47,15 @@ class Validator:
     @staticmethod
     def validation_report(df: pd.DataFrame) -> dict:
         """Generates a generic profile report."""
+        # One isna traversal feeds the total; the row-hash duplicate
+        # check is skipped outright for frames that cannot have dupes.
+        null_per_col = df.isna().sum()
         report = {
             'rows': len(df),
             'columns': len(df.columns),
-            'nulls_total': df.isnull().sum().sum(),
-            'duplicates': df.duplicated().sum(),
-            'dtypes': df.dtypes.to_dict()
+            'nulls_total': int(null_per_col.sum()),
+            'duplicates': int(df.duplicated().sum()) if len(df) > 1 else 0,
+            'dtypes': dict(zip(df.columns, df.dtypes))
         }
         logger.info(f"Validation Report: {report}")
         return report
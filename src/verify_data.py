@@ -1,5 +1,4 @@
 import os
-import pandas as pd
 from sqlalchemy import create_engine
 from urllib.parse import quote_plus
 
@@ -14,19 +13,21 @@ encoded_password = quote_plus(password)
 conn_str = f"mysql+mysqlconnector://{user}:{encoded_password}@{host}:{port}/{db_name}"
 engine = create_engine(conn_str)
 
-def check_table(table_name):
+def check_table(conn, table_name):
     try:
-        df = pd.read_sql(f"SELECT COUNT(*) as count FROM {table_name}", engine)
-        count = df['count'].iloc[0]
+        # Raw driver scalar fetch — no DataFrame built for one integer.
+        count = conn.exec_driver_sql(f"SELECT COUNT(*) FROM {table_name}").scalar()
         print(f"✅ {table_name}: {count} rows")
     except Exception as e:
         print(f"❌ {table_name}: Error - {e}")
 
 print("--- Data Warehouse Verification ---")
 tables = [
-    'stg_customers', 'stg_policy', 'stg_transactions', 
+    'stg_customers', 'stg_policy', 'stg_transactions',
     'dim_customer', 'dim_policy', 'fact_policy_txn'
 ]
 
-for t in tables:
-    check_table(t)
+# One connection for all counts instead of a checkout per table.
+with engine.connect() as conn:
+    for t in tables:
+        check_table(conn, t)